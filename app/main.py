@@ -9,12 +9,12 @@ import logging
 
 from api import load_custom_topics_api, status, summarize_and_send_to_group_api, webhook, setup_api
 import models  # noqa
-from config import Settings
+from config import get_settings
 from whatsapp import WhatsAppClient
 from whatsapp.init_groups import gather_groups
 from utils.bedrock_embed_text import BedrockEmbeddingClient
 
-settings = Settings()  # pyright: ignore [reportCallIssue]
+settings = get_settings()
 
 
 @asynccontextmanager
@@ -58,6 +58,7 @@ async def lifespan(app: FastAPI):
     try:
         yield
     finally:
+        app.state.embedding_client.close()
         await engine.dispose()
 
 
@@ -1,27 +1,65 @@
 import hashlib
 import logging
 from datetime import datetime
-from typing import Annotated, Dict, Any, List
+from itertools import batched
+from typing import Annotated, Dict, Any, Iterator, List
+import numpy as np
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from models import Group, KBTopicCreate
-from models.knowledge_base_topic import KBTopic
-from models.upsert import bulk_upsert
-from utils.bedrock_embed_text import BedrockEmbeddingClient, bedrock_embed_text
+from models import Group, KBTopic
+from models.upsert import bulk_upsert, bulk_copy_upsert
+from utils.bedrock_embed_text import BedrockEmbeddingClient, cached_embed
 from .deps import get_db_async_session, get_text_embebedding
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Above this many rows, load through COPY instead of a multi-row INSERT
+COPY_THRESHOLD = 100
+# Rows materialized and written per round-trip
+UPSERT_CHUNK_SIZE = 10_000
+
 
 class CustomTopic(BaseModel):
     subject: str
     summary: str
 
 
+def _row_id(prefix_hash: Any, subject_key: bytes) -> str:
+    # Resume from the already-hashed "<group_jid>_<start_time>_" prefix
+    h = prefix_hash.copy()
+    h.update(subject_key)
+    return h.hexdigest()
+
+
+def _iter_rows(
+    group_list: List[Group],
+    topics: List[CustomTopic],
+    topics_embeddings: List[np.ndarray],
+    start_time: datetime,
+) -> Iterator[KBTopic]:
+    """Yield a KBTopic for every (managed group, topic) pair."""
+    # Constant parts of the row keys are encoded and hashed once
+    key_infix = f"_{start_time.isoformat()}_".encode()
+    subject_keys = [topic.subject.encode() for topic in topics]
+
+    for group in group_list:
+        group_hash = hashlib.blake2b(group.group_jid.encode() + key_infix, digest_size=16)
+        for topic, subject_key, emb in zip(topics, subject_keys, topics_embeddings):
+            yield KBTopic(
+                id=_row_id(group_hash, subject_key),
+                embedding=emb,
+                group_jid=group.group_jid,
+                start_time=start_time,
+                speakers="",  # No speakers for custom topics
+                summary=topic.summary,
+                subject=topic.subject,
+            )
+
+
 @router.post("/load_custom_topics")
 async def load_custom_topics_api(
     topics: List[CustomTopic],
@@ -45,35 +83,29 @@ async def load_custom_topics_api(
                 "message": "No managed groups found",
             }
 
-        # Create embeddings for all topics
-        documents = [f"# {topic.subject}\n{topic.summary}" for topic in topics]
-        topics_embeddings = await bedrock_embed_text(embedding_client, documents)
+        # Create embeddings for all topics, embedding each identical document
+        # once and scattering the results back to topic order
+        uniq: Dict[str, int] = {}
+        order = [
+            uniq.setdefault(f"# {topic.subject}\n{topic.summary}", len(uniq))
+            for topic in topics
+        ]
+        uniq_embeddings = await cached_embed(embedding_client, list(uniq))
+        topics_embeddings = [uniq_embeddings[i] for i in order]
 
-        total_loaded = 0
         start_time = datetime.now()
 
-        # Load topics for each managed group
-        for group in group_list:
-            doc_models = [
-                KBTopicCreate(
-                    id=str(
-                        hashlib.sha256(
-                            f"{group.group_jid}_{start_time}_{topic.subject}".encode()
-                        ).hexdigest()
-                    ),
-                    embedding=emb,
-                    group_jid=group.group_jid,
-                    start_time=start_time,
-                    speakers="",  # No speakers for custom topics
-                    summary=topic.summary,
-                    subject=topic.subject,
-                )
-                for topic, emb in zip(topics, topics_embeddings)
-            ]
-
-            await bulk_upsert(session, [KBTopic(**doc.model_dump()) for doc in doc_models])
-            total_loaded += len(doc_models)
-            logger.info(f"Loaded {len(doc_models)} topics for group {group.group_name}")
+        # Stream rows into the DB in chunks to cap peak memory
+        total_loaded = 0
+        for chunk in batched(
+            _iter_rows(group_list, topics, topics_embeddings, start_time),
+            UPSERT_CHUNK_SIZE,
+        ):
+            if len(chunk) > COPY_THRESHOLD:
+                await bulk_copy_upsert(session, chunk)
+            else:
+                await bulk_upsert(session, chunk)
+            total_loaded += len(chunk)
 
         await session.commit()
 
@@ -3,28 +3,110 @@ Setup API endpoints for WhatsApp bot configuration.
 This module provides web UI and API endpoints for managing groups.
 """
 
-from typing import List, Annotated
+import asyncio
+import hashlib
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Annotated, Tuple
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import HTMLResponse, Response
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from pydantic import BaseModel
-from sqlmodel import select
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import update
+from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 import secrets
 
 from api.deps import get_db_async_session
 from models.group import Group
 from whatsapp.client import WhatsAppClient
-from config import Settings
+from config import Settings, get_settings
 
 router = APIRouter()
 security = HTTPBasic()
 
+# Short-lived WhatsApp status so wizard polling doesn't probe on every hit
+_status_cache = TTLCache(maxsize=1, ttl=1.0)
+_status_lock = asyncio.Lock()
 
-def verify_credentials(credentials: Annotated[HTTPBasicCredentials, Depends(security)]):
+# The setup wizard is static, so read it once at import time
+_SETUP_HTML_PATH = Path(__file__).parent / "setup-wizard.html"
+_SETUP_HTML = (
+    _SETUP_HTML_PATH.read_text(encoding="utf-8") if _SETUP_HTML_PATH.exists() else None
+)
+
+# Simple HTML page that embeds WhatsApp Web; filled in by _render_qr_page
+_QR_TEMPLATE = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            body {{
+                margin: 0;
+                padding: 0;
+                overflow: hidden;
+                background: #f9fafb;
+            }}
+            iframe {{
+                width: 100%;
+                height: 100vh;
+                border: none;
+            }}
+            .loading {{
+                position: absolute;
+                top: 50%;
+                left: 50%;
+                transform: translate(-50%, -50%);
+                text-align: center;
+                color: #6b7280;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="loading">
+            <p>Loading WhatsApp Web...</p>
+        </div>
+        <iframe src="{url}" onload="document.querySelector('.loading').style.display='none'"></iframe>
+    </body>
+    </html>
+    """
+
+
+def _encode_page(html: str) -> Tuple[bytes, str]:
+    """Encode a rendered page once and derive its ETag from the content."""
+    body = html.encode("utf-8")
+    return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+@lru_cache(maxsize=32)
+def _render_setup_page(template: str, host: str) -> Tuple[bytes, str]:
+    return _encode_page(template.replace("{{HOST}}", host))
+
+
+@lru_cache(maxsize=32)
+def _render_qr_page(url: str) -> Tuple[bytes, str]:
+    return _encode_page(_QR_TEMPLATE.format(url=url))
+
+
+def _html_page_response(request: Request, page: Tuple[bytes, str]) -> Response:
+    """Serve pre-encoded HTML, answering matching conditional GETs with 304."""
+    body, etag = page
+    # Pages sit behind (or embed) credentials, so only the browser may cache them
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/html", headers=headers)
+
+
+def verify_credentials(
+    credentials: Annotated[HTTPBasicCredentials, Depends(security)],
+    settings: Annotated[Settings, Depends(get_settings)],
+):
     """Verify basic auth credentials."""
-    settings = Settings()
-    
     expected_username = settings.whatsapp_basic_auth_user or "admin"
     expected_password = settings.whatsapp_basic_auth_password or ""
     
@@ -54,6 +136,8 @@ class GroupUpdate(BaseModel):
 
 class GroupResponse(BaseModel):
     """Model for group response."""
+    model_config = ConfigDict(from_attributes=True)
+
     group_jid: str
     group_name: str
     managed: bool
@@ -65,13 +149,7 @@ async def setup_page(request: Request, username: str = Depends(verify_credential
     Serve the setup wizard HTML page.
     This is the main entry point for clients to configure their bot.
     """
-    import os
-    from pathlib import Path
-    
-    # Read the HTML file
-    html_path = Path(__file__).parent / "setup-wizard.html"
-    
-    if not html_path.exists():
+    if _SETUP_HTML is None:
         # Fallback: return inline HTML if file not found
         return HTMLResponse(content="""
         <!DOCTYPE html>
@@ -84,23 +162,20 @@ async def setup_page(request: Request, username: str = Depends(verify_credential
         </html>
         """, status_code=500)
     
-    with open(html_path, "r", encoding="utf-8") as f:
-        html_content = f.read()
-    
     # Replace {{HOST}} with actual hostname
-    html_content = html_content.replace("{{HOST}}", request.url.hostname or "localhost")
+    page = _render_setup_page(_SETUP_HTML, request.url.hostname or "localhost")
     
-    return HTMLResponse(content=html_content)
+    return _html_page_response(request, page)
 
 
 @router.get("/whatsapp-qr", response_class=HTMLResponse)
-async def whatsapp_qr_iframe(request: Request):
+async def whatsapp_qr_iframe(
+    request: Request, settings: Annotated[Settings, Depends(get_settings)]
+):
     """
     Proxy endpoint for WhatsApp Web QR code.
     Returns an iframe-friendly page that embeds the WhatsApp Web interface.
     """
-    from config import Settings
-    settings = Settings()
     
     # Use the same host as the request but port 3000 with auth
     host = request.url.hostname
@@ -108,44 +183,7 @@ async def whatsapp_qr_iframe(request: Request):
     password = settings.whatsapp_basic_auth_password or ""
     whatsapp_url = f"http://{username}:{password}@{host}:3000"
     
-    # Create a simple HTML page that embeds WhatsApp Web
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            body {{
-                margin: 0;
-                padding: 0;
-                overflow: hidden;
-                background: #f9fafb;
-            }}
-            iframe {{
-                width: 100%;
-                height: 100vh;
-                border: none;
-            }}
-            .loading {{
-                position: absolute;
-                top: 50%;
-                left: 50%;
-                transform: translate(-50%, -50%);
-                text-align: center;
-                color: #6b7280;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="loading">
-            <p>Loading WhatsApp Web...</p>
-        </div>
-        <iframe src="{whatsapp_url}" onload="document.querySelector('.loading').style.display='none'"></iframe>
-    </body>
-    </html>
-    """
-    
-    return HTMLResponse(content=html)
+    return _html_page_response(request, _render_qr_page(whatsapp_url))
 
 
 @router.get("/api/groups", response_model=List[GroupResponse])
@@ -157,18 +195,15 @@ async def list_groups(
     Returns group JID, name, and managed status.
     """
     try:
-        statement = select(Group).order_by(Group.group_name)
-        result = await session.execute(statement)
-        groups = result.scalars().all()
+        # Stream rows through a server-side cursor and convert them in one pass
+        statement = (
+            select(Group)
+            .order_by(Group.group_name)
+            .execution_options(yield_per=500)
+        )
+        result = await session.stream_scalars(statement)
         
-        return [
-            GroupResponse(
-                group_jid=group.group_jid,
-                group_name=group.group_name,
-                managed=group.managed
-            )
-            for group in groups
-        ]
+        return [GroupResponse.model_validate(group) async for group in result]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch groups: {str(e)}")
 
@@ -183,14 +218,27 @@ async def update_groups(
     Enables or disables bot responses for specific groups.
     """
     try:
-        for update in updates:
-            statement = select(Group).where(Group.group_jid == update.group_jid)
-            result = await session.execute(statement)
-            group = result.scalar_one_or_none()
-            
-            if group:
-                group.managed = update.managed
-                session.add(group)
+        # Last update wins for repeated JIDs, as with sequential updates
+        wanted = {u.group_jid: u.managed for u in updates}
+        current = {}
+        if wanted:
+            result = await session.execute(
+                select(Group.group_jid, Group.managed).where(
+                    col(Group.group_jid).in_(wanted.keys())
+                )
+            )
+            current = dict(result.tuples().all())
+        
+        # Only write groups whose managed flag actually changes;
+        # unknown group JIDs are skipped
+        changed = [
+            {"group_jid": jid, "managed": managed}
+            for jid, managed in wanted.items()
+            if jid in current and current[jid] != managed
+        ]
+        if changed:
+            # ORM bulk UPDATE by primary key: one executemany statement
+            await session.execute(update(Group), changed)
         
         await session.commit()
         
@@ -201,6 +249,17 @@ async def update_groups(
         raise HTTPException(status_code=500, detail=f"Failed to update groups: {str(e)}")
 
 
+async def _probe_whatsapp_connected(client: WhatsAppClient) -> bool:
+    """Check whether at least one WhatsApp device is connected."""
+    try:
+        devices = await client.get_devices()
+        return devices is not None and hasattr(devices, 'results') and len(devices.results) > 0
+    except Exception as e:
+        # Log the error for debugging
+        logging.error(f"WhatsApp status check failed: {e}")
+        return False
+
+
 @router.get("/api/whatsapp/status")
 async def whatsapp_status(request: Request):
     """
@@ -211,15 +270,14 @@ async def whatsapp_status(request: Request):
         # Get WhatsAppClient from app state
         client: WhatsAppClient = request.app.state.whatsapp
         
-        # Try to get devices to verify connection
-        try:
-            devices = await client.get_devices()
-            connected = devices is not None and hasattr(devices, 'results') and len(devices.results) > 0
-        except Exception as e:
-            # Log the error for debugging
-            import logging
-            logging.error(f"WhatsApp status check failed: {e}")
-            connected = False
+        # Concurrent pollers share one probe; its result is reused for a second
+        connected = _status_cache.get("connected")
+        if connected is None:
+            async with _status_lock:
+                connected = _status_cache.get("connected")
+                if connected is None:
+                    connected = await _probe_whatsapp_connected(client)
+                    _status_cache["connected"] = connected
         
         return {
             "connected": connected,
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from os import environ
 from typing import Optional, Self
 
@@ -44,3 +45,8 @@ class Settings(BaseSettings):
             environ["AWS_DEFAULT_REGION"] = self.aws_region
 
         return self
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()  # pyright: ignore [reportCallIssue]
@@ -1,8 +1,8 @@
 from .group import Group, BaseGroup
-from .knowledge_base_topic import KBTopic, KBTopicCreate
+from .knowledge_base_topic import KBTopic
 from .message import Message, BaseMessage
 from .sender import Sender, BaseSender
-from .upsert import upsert, bulk_upsert
+from .upsert import upsert, bulk_upsert, bulk_copy_upsert
 from .webhook import WhatsAppWebhookPayload
 
 __all__ = [
@@ -15,6 +15,6 @@ __all__ = [
     "WhatsAppWebhookPayload",
     "upsert",
     "bulk_upsert",
+    "bulk_copy_upsert",
     "KBTopic",
-    "KBTopicCreate",
 ]
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import List, Optional, Any
+from typing import Optional, Any
 
 from pgvector.sqlalchemy import Vector
 from sqlmodel import Field, SQLModel, Index, Column, DateTime
@@ -20,11 +20,6 @@ class KBTopicBase(SQLModel):
     summary: str
 
 
-class KBTopicCreate(KBTopicBase):
-    id: str
-    embedding: List[float]
-
-
 class KBTopic(KBTopicBase, table=True):
     id: str = Field(primary_key=True)
     embedding: Any = Field(sa_type=Vector(1024))
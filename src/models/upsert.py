@@ -1,9 +1,14 @@
-from typing import List
+from typing import Sequence
 
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Table
 from sqlalchemy.dialects.postgresql import insert
-from sqlmodel import SQLModel, select
+from sqlmodel import SQLModel, select, text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+# PostgreSQL's wire protocol allows at most 32767 bind parameters per statement
+MAX_BIND_PARAMS = 32767
+
 
 async def upsert(session: AsyncSession, entity: SQLModel):
     # Split fields into primary keys and values
@@ -36,7 +41,7 @@ async def upsert(session: AsyncSession, entity: SQLModel):
     return result
 
 
-async def bulk_upsert(session: AsyncSession, entities: List[SQLModel]):
+async def bulk_upsert(session: AsyncSession, entities: Sequence[SQLModel]):
     if not entities:
         return None
 
@@ -55,17 +60,102 @@ async def bulk_upsert(session: AsyncSession, entities: List[SQLModel]):
             row_data[f.name] = getattr(entity, f.name)
         values_list.append(row_data)
 
-    # Create bulk insert statement
-    stmt = insert(entity_class).values(values_list)
+    # Split into statements that stay under asyncpg's bind parameter limit
+    rows_per_stmt = MAX_BIND_PARAMS // len(values_list[0])
 
-    # Create on_conflict_do_update statement
-    stmt = stmt.on_conflict_do_update(
-        index_elements=list(pkeys),
-        set_={
-            col.name: stmt.excluded[col.name]
-            for col in entity_class.__table__.columns
-            if not col.primary_key
-        },
+    result = None
+    for start in range(0, len(values_list), rows_per_stmt):
+        # Create bulk insert statement
+        stmt = insert(entity_class).values(values_list[start : start + rows_per_stmt])
+
+        # Create on_conflict_do_update statement
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(pkeys),
+            set_={
+                col.name: stmt.excluded[col.name]
+                for col in entity_class.__table__.columns
+                if not col.primary_key
+            },
+        )
+
+        result = await session.exec(stmt)
+
+    return result
+
+
+async def bulk_copy_upsert(session: AsyncSession, entities: Sequence[SQLModel]):
+    """
+    Upsert entities by streaming them with PostgreSQL COPY into a temporary
+    table, then merging into the target table with INSERT ... ON CONFLICT.
+
+    Cheaper than bulk_upsert for large batches, since rows are sent in
+    COPY's binary format instead of as bound statement parameters. The
+    temporary table lives until the end of the transaction, so repeated
+    calls (e.g. per chunk) reuse it.
+    """
+    if not entities:
+        return None
+
+    table: Table = entities[0].__table__  # pyright: ignore [reportAttributeAccessIssue]
+    columns = [col.name for col in table.columns]
+    pkeys = [col.name for col in table.columns if col.primary_key]
+    tmp_table = f"_copy_{table.name}"
+
+    conn = await session.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+    assert raw is not None, "Raw asyncpg connection not available"
+
+    # asyncpg has no codec for pgvector columns, so stage them as text
+    # (serialized the same way the ORM binds them) and cast on merge
+    vector_cols = {
+        col.name: col.type
+        for col in table.columns
+        if isinstance(col.type, Vector)
+    }
+    processors = {
+        name: type_.bind_processor(conn.dialect) for name, type_ in vector_cols.items()
+    }
+
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    staged = ", ".join(
+        f'"{c}"::text AS "{c}"' if c in vector_cols else f'"{c}"' for c in columns
+    )
+    await conn.execute(
+        text(
+            f'CREATE TEMP TABLE IF NOT EXISTS "{tmp_table}" ON COMMIT DROP AS '
+            f'SELECT {staged} FROM "{table.name}" WITH NO DATA'
+        )
+    )
+    await conn.execute(text(f'TRUNCATE "{tmp_table}"'))
+
+    # Entities commonly share vector objects (e.g. one embedding per topic
+    # across groups), so serialize each distinct object only once
+    serialized: dict = {}
+
+    def _value(entity: SQLModel, column: str):
+        value = getattr(entity, column)
+        if column not in processors:
+            return value
+        key = (column, id(value))
+        if key not in serialized:
+            serialized[key] = processors[column](value)
+        return serialized[key]
+
+    await raw.copy_records_to_table(
+        tmp_table,
+        records=(tuple(_value(e, c) for c in columns) for e in entities),
+        columns=columns,
     )
 
-    return await session.exec(stmt)
+    selected = ", ".join(
+        f'"{c}"::{vector_cols[c].get_col_spec()}' if c in vector_cols else f'"{c}"'
+        for c in columns
+    )
+    updates = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in columns if c not in pkeys)
+    return await conn.execute(
+        text(
+            f'INSERT INTO "{table.name}" ({quoted}) '
+            f'SELECT {selected} FROM "{tmp_table}" '
+            f'ON CONFLICT ({", ".join(pkeys)}) DO UPDATE SET {updates}'
+        )
+    )
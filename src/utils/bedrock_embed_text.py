@@ -1,60 +1,148 @@
 import asyncio
+import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List
 import boto3
-from functools import partial
+import numpy as np
+from botocore.config import Config
+from cachetools import LRUCache
+
+# Content-addressed embedding cache: (model_id, document) digest -> float32 bytes
+_embedding_cache: LRUCache = LRUCache(maxsize=10_000)
+
+
+@lru_cache(maxsize=4)
+def _bedrock_client(region_name: str):
+    """Shared bedrock-runtime client per region; boto3 clients are costly to build."""
+    return boto3.client(
+        "bedrock-runtime",
+        region_name=region_name,
+        # Enough pooled connections for concurrent invoke_model calls
+        config=Config(max_pool_connections=32, retries={"mode": "adaptive"}),
+    )
 
 
 class BedrockEmbeddingClient:
     """AWS Bedrock client for Titan Text Embeddings V2"""
 
-    def __init__(self, region_name: str = "eu-central-1"):
-        self.client = boto3.client("bedrock-runtime", region_name=region_name)
+    def __init__(self, region_name: str = "eu-central-1", max_concurrent: int = 16):
+        self.client = _bedrock_client(region_name)
         self.model_id = "amazon.titan-embed-text-v2:0"
+        self.max_concurrent = max_concurrent
+        # Dedicated threads for blocking boto3 calls, so embedding neither
+        # caps at nor starves the loop's default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix="bedrock-embed"
+        )
+
+    def close(self) -> None:
+        """Release the embedding threads; pending calls are cancelled."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
-    def _embed_sync(self, texts: List[str]) -> List[List[float]]:
+    def _invoke(self, text: str) -> np.ndarray:
         """
-        Synchronous embedding method (runs in executor)
+        Synchronous single-text embedding call (runs in executor)
         """
-        embeddings = []
+        body = json.dumps({"inputText": text})
 
-        # Titan processes one text at a time
-        for text in texts:
-            body = json.dumps({"inputText": text})
+        response = self.client.invoke_model(
+            modelId=self.model_id,
+            body=body,
+            contentType="application/json",
+            accept="application/json",
+        )
 
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=body,
-                contentType="application/json",
-                accept="application/json",
-            )
+        response_body = json.loads(response["body"].read())
+        return np.asarray(response_body["embedding"], dtype=np.float32)
 
-            response_body = json.loads(response["body"].read())
-            embeddings.append(response_body["embedding"])
-
-        return embeddings
+    async def _embed_one(self, text: str) -> np.ndarray:
+        # Run synchronous boto3 call in executor to avoid blocking
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._invoke, text)
 
     async def embed(
         self, texts: List[str], batch_size: int = 128
-    ) -> List[List[float]]:
+    ) -> List[np.ndarray]:
         """
         Generate embeddings for a list of texts using Bedrock Titan
 
+        Titan processes one text per request, so requests are issued
+        concurrently (bounded by max_concurrent), longest texts first to
+        shorten the tail, and results are returned in input order.
+
         Args:
             texts: List of text strings to embed
             batch_size: Number of texts to process at once (Titan supports 1 at a time)
 
         Returns:
-            List of embedding vectors
+            List of float32 embedding vectors
         """
-        # Run synchronous boto3 call in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, partial(self._embed_sync, texts))
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        out: List[np.ndarray] = [None] * len(texts)  # type: ignore[list-item]
+
+        async def _bounded(i: int, text: str) -> None:
+            async with semaphore:
+                out[i] = await self._embed_one(text)
+
+        # Tasks acquire the semaphore in creation order; the TaskGroup
+        # cancels the remaining ones as soon as one call fails
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for i in order:
+                    tg.create_task(_bounded(i, texts[i]))
+        except ExceptionGroup as eg:
+            # Surface the first Bedrock error as-is, as before
+            raise eg.exceptions[0] from eg
+        return out
+
+
+def _cache_key(model_id: str, text: str) -> bytes:
+    return hashlib.blake2b(f"{model_id}\n{text}".encode(), digest_size=16).digest()
+
+
+async def cached_embed(
+    embedding_client: BedrockEmbeddingClient, texts: List[str]
+) -> List[np.ndarray]:
+    """
+    Embed texts, only sending cache misses to Bedrock
+
+    Meant for curated documents that get re-submitted (custom topics);
+    one-off texts such as user questions should use bedrock_embed_text
+    so they don't evict cached topic vectors.
+
+    Args:
+        embedding_client: BedrockEmbeddingClient instance
+        texts: List of text strings to embed
+
+    Returns:
+        List of float32 embedding vectors, in input order
+    """
+    keys = [_cache_key(embedding_client.model_id, text) for text in texts]
+    out: List[np.ndarray] = [None] * len(texts)  # type: ignore[list-item]
+
+    missing_idx = []
+    for i, key in enumerate(keys):
+        cached = _embedding_cache.get(key)
+        if cached is None:
+            missing_idx.append(i)
+        else:
+            out[i] = np.frombuffer(cached, dtype=np.float32)
+
+    if missing_idx:
+        missing_embs = await embedding_client.embed([texts[i] for i in missing_idx])
+        for i, emb in zip(missing_idx, missing_embs):
+            _embedding_cache[keys[i]] = emb.tobytes()
+            out[i] = emb
+
+    return out
 
 
 async def bedrock_embed_text(
     embedding_client: BedrockEmbeddingClient, input: List[str]
-) -> List[List[float]]:
+) -> List[np.ndarray]:
     """
     Embed text using AWS Bedrock Titan embeddings
 
@@ -63,6 +151,6 @@ async def bedrock_embed_text(
         input: List of text strings to embed
 
     Returns:
-        List of embedding vectors
+        List of float32 embedding vectors
     """
     return await embedding_client.embed(input)